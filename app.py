@@ -1,6 +1,12 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from pydantic import BaseModel
-from studentinfo_scrap import AcademiaClient
+from studentinfo_scrap import AcademiaClient, DeadlineExceeded
+from utils.transport import get_pool_stats
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(title="Academia Scraper API")
@@ -22,6 +28,20 @@ app.add_middleware(
 )
 
 
+# How often /scrape checks whether its client is still connected (seconds)
+DISCONNECT_POLL_INTERVAL = 0.2
+
+# Background logouts get their own small pool so a stuck portal cannot
+# starve the default executor used by the scrape steps
+LOGOUT_WORKERS = 4
+_logout_executor = ThreadPoolExecutor(max_workers=LOGOUT_WORKERS, thread_name_prefix="academia-logout")
+_background_logouts = set()
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client of an in-progress scrape goes away"""
+
+
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -32,56 +52,163 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/stats/pool")
+async def pool_stats():
+    """Report utilization and connection reuse of the shared HTTP pool"""
+    return get_pool_stats()
+
+
+async def _watch_disconnect(http_request: Request):
+    """Resolve once the client that sent the request has gone away"""
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _run_step(step, watcher: asyncio.Task, client: AcademiaClient):
+    """Run a blocking client step on a worker thread, racing disconnect and deadline"""
+    task = asyncio.create_task(asyncio.to_thread(step))
+    done, _ = await asyncio.wait(
+        {task, watcher},
+        timeout=client.remaining(),
+        return_when=asyncio.FIRST_COMPLETED,
+    )
+    if watcher in done:
+        raise ClientDisconnected()
+    if task not in done:
+        raise DeadlineExceeded("Deadline exceeded")
+    return task.result()
+
+
+def _report_logout(future):
+    """Drop the reference to a finished background logout and report failures"""
+    _background_logouts.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        print(f"✗ Background logout failed: {future.exception()}\n")
+
+
+def _logout_in_background(client: AcademiaClient):
+    """Log out on the logout executor without holding up the response"""
+    future = _logout_executor.submit(client.logout)
+    _background_logouts.add(future)
+    future.add_done_callback(_report_logout)
+
+
+async def _logout(client: AcademiaClient, deadline: Optional[float]) -> str:
+    """Log out inline, or in the background when the caller is on a deadline"""
+    if deadline is not None:
+        _logout_in_background(client)
+        return "scheduled"
+    logout_success = await asyncio.to_thread(client.logout)
+    return "success" if logout_success else "failed"
+
+
 @app.post("/scrape")
-async def scrape_portal(request: LoginRequest):
-    """Scrape portal data and automatically logout after completion"""
-    client = None
+async def scrape_portal(
+    request: LoginRequest,
+    http_request: Request,
+    deadline_ms: Optional[int] = Query(None, gt=0),
+    x_deadline_ms: Optional[int] = Header(None, gt=0),
+):
+    """
+    Scrape portal data and automatically logout after completion
+
+    A deadline in milliseconds may be given through the X-Deadline-Ms header
+    or the deadline_ms query parameter. Sections that are not ready when it
+    expires are listed in missing_sections instead of holding up the
+    response, and all upstream work is abandoned if the client disconnects.
+    """
+    budget_ms = x_deadline_ms if x_deadline_ms is not None else deadline_ms
+    deadline = time.monotonic() + budget_ms / 1000 if budget_ms is not None else None
+
+    client = AcademiaClient(request.email, request.password, deadline=deadline)
+    watcher = asyncio.create_task(_watch_disconnect(http_request))
+    tasks = {}
     try:
-        client = AcademiaClient(request.email, request.password)
-
         # Step 1: Lookup user
-        if not client.lookup_user():
+        if not await _run_step(client.lookup_user, watcher, client):
             raise HTTPException(status_code=401, detail="User lookup failed")
 
         # Step 2: Login
-        if not client.login():
+        if not await _run_step(client.login, watcher, client):
             raise HTTPException(status_code=401, detail="Login failed")
 
-        # Step 3a: Fetch day order
-        day_order = client.get_day_order()
-
-        # Step 3b: Fetch and parse attendance
-        attendance_data = client.get_attendance()
-        if attendance_data and day_order is not None:
-            attendance_data['day_order'] = day_order
+        results = {}
+        missing_sections = []
+        if deadline is None:
+            # Step 3: Fetch day order, attendance and timetable in turn
+            results["day_order"] = await _run_step(client.get_day_order, watcher, client)
+            results["attendance"] = await _run_step(client.get_attendance, watcher, client)
+            results["timetable"] = await _run_step(client.get_timetable, watcher, client)
         else:
-            attendance_data['day_order'] = 3  # default day order
-
-        # Step 4: Fetch timetable
-        timetable_data = client.get_timetable()
+            # Step 3: Fetch the sections concurrently, each on its own session,
+            # and keep whatever is ready when the deadline passes
+            tasks = {
+                "day_order": asyncio.create_task(asyncio.to_thread(client.fork().get_day_order)),
+                "attendance": asyncio.create_task(asyncio.to_thread(client.fork().get_attendance)),
+                "timetable": asyncio.create_task(asyncio.to_thread(client.fork().get_timetable)),
+            }
+            pending = set(tasks.values())
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending | {watcher},
+                    timeout=client.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done or watcher in done:
+                    break
+                pending -= done
+
+            if watcher.done():
+                raise ClientDisconnected()
+
+            for name, task in tasks.items():
+                if task.done() and not isinstance(task.exception(), DeadlineExceeded):
+                    results[name] = task.result()
+                else:
+                    results[name] = None
+                    missing_sections.append(name)
+
+            # Stop any section still running once the deadline has passed
+            if missing_sections:
+                client.cancel()
+
+        attendance_data = results["attendance"]
+        day_order = results["day_order"]
+        if attendance_data is not None:
+            attendance_data['day_order'] = day_order if day_order is not None else 3  # default day order
 
         # Prepare response
         response_data = {
-            "status": "success",
+            "status": "partial" if missing_sections else "success",
             "attendance": attendance_data,
-            "timetable": timetable_data
+            "timetable": results["timetable"],
+            "missing_sections": missing_sections,
         }
 
-        # Step 5: Auto-logout after scraping
-        logout_success = client.logout()
-        response_data["logout_status"] = "success" if logout_success else "failed"
+        # Step 4: Auto-logout after scraping
+        response_data["logout_status"] = await _logout(client, deadline)
 
         return response_data
 
+    except ClientDisconnected:
+        # Nobody is waiting for the result, so drop the remaining work
+        client.cancel()
+        _logout_in_background(client)
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except DeadlineExceeded:
+        client.cancel()
+        _logout_in_background(client)
+        raise HTTPException(status_code=504, detail="Deadline exceeded before login completed")
     except HTTPException:
-        # Re-raise HTTP exceptions
-        if client:
-            client.logout()  # Attempt logout even on error
+        # Attempt logout even on error
+        await _logout(client, deadline)
         raise
     except Exception as e:
         # Attempt logout on any error
-        if client:
-            client.logout()
+        client.cancel()
+        await _logout(client, deadline)
         raise HTTPException(status_code=500, detail=str(e))
-
-
+    finally:
+        watcher.cancel()
+        for task in tasks.values():
+            task.cancel()
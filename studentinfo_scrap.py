@@ -1,11 +1,20 @@
 import requests
 import json
 import re
+import socket
+import threading
+import time
 from typing import Dict, Optional, Any, List
 from bs4 import BeautifulSoup
+from urllib3.exceptions import ReadTimeoutError
 
 # importing parser utility functions
 from utils.parser import *
+from utils.transport import create_session, observe_connections
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request deadline passes or the caller cancels the client"""
 
 
 class AcademiaClient:
@@ -13,17 +22,31 @@ class AcademiaClient:
     
     BASE_URL = "https://academia.srmist.edu.in"
     
-    def __init__(self, email: str, password: str):
+    # Upstream socket timeout (seconds) when the caller gives no deadline
+    DEFAULT_TIMEOUT = 30
+    # Fixed timeout (seconds) for logout, which ignores the deadline
+    LOGOUT_TIMEOUT = 10
+    # Body is read in chunks of this size; a chunk read blocks until it fills,
+    # so a slow request is cut off by the deadline timer, not between chunks
+    CHUNK_SIZE = 16 * 1024
+    
+    def __init__(self, email: str, password: str, deadline: Optional[float] = None):
         """
         Initialize the Academia client
         
         Args:
             email: User email address
             password: User password
+            deadline: Optional time.monotonic() value after which fetches are abandoned
         """
         self.email = email
         self.password = password
-        self.session = requests.Session()
+        self.deadline = deadline
+        self._cancelled = threading.Event()
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+        # Own cookie jar, shared keep-alive connection pool
+        self.session = create_session()
         self.identifier = None
         self.digest = None
         self._setup_session()
@@ -52,6 +75,146 @@ class AcademiaClient:
         }
         self.session.cookies.update(initial_cookies)
     
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None when there is no deadline"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+    
+    def cancel(self):
+        """Abandon any remaining work and abort requests already in progress"""
+        self._cancelled.set()
+        # Abort under the lock so nothing is shut down after its request
+        # has untracked it and handed the connection back to the pool
+        with self._inflight_lock:
+            for item in self._inflight:
+                self._abort(item)
+    
+    def fork(self) -> 'AcademiaClient':
+        """
+        Return a client with its own session carrying this client's login
+        
+        The fork shares the deadline and cancellation, so it can fetch on
+        another thread while cancel() on either client still stops both.
+        """
+        clone = AcademiaClient(self.email, self.password, deadline=self.deadline)
+        clone.identifier = self.identifier
+        clone.digest = self.digest
+        clone._cancelled = self._cancelled
+        clone._inflight = self._inflight
+        clone._inflight_lock = self._inflight_lock
+        clone.session.cookies.update(self.session.cookies)
+        return clone
+    
+    def _check_deadline(self):
+        """Raise DeadlineExceeded if the client was cancelled or ran out of time"""
+        if self._cancelled.is_set():
+            raise DeadlineExceeded("Request cancelled")
+        if self.remaining() == 0.0:
+            raise DeadlineExceeded("Deadline exceeded")
+    
+    @staticmethod
+    def _abort(item):
+        """Unblock a thread waiting on a pooled connection or reading a response body"""
+        try:
+            if isinstance(item, requests.Response):
+                item.raw.shutdown()
+            elif item.sock is not None:
+                item.sock.shutdown(socket.SHUT_RDWR)
+        except (ValueError, RuntimeError, OSError):
+            # Already released to the pool or closed
+            pass
+    
+    def _track(self, tracked: list, item):
+        """Register a connection or response of the current request for aborting"""
+        with self._inflight_lock:
+            tracked.append(item)
+            self._inflight.add(item)
+            if self._cancelled.is_set():
+                self._abort(item)
+    
+    def _untrack(self, tracked: list):
+        """Forget everything registered for the current request"""
+        with self._inflight_lock:
+            for item in tracked:
+                self._inflight.discard(item)
+            tracked.clear()
+    
+    def _expire(self, tracked: list, expired: threading.Event):
+        """Deadline timer callback: abort the request still in progress"""
+        expired.set()
+        with self._inflight_lock:
+            for item in tracked:
+                self._abort(item)
+    
+    def _is_deadline_error(self, error: Exception) -> bool:
+        """Whether a transport error was caused by the deadline or by cancel()"""
+        if self._cancelled.is_set():
+            return True
+        if self.deadline is None:
+            return False
+        if self.remaining() == 0.0 or isinstance(error, requests.Timeout):
+            return True
+        # requests re-raises read timeouts during the body download as ConnectionError
+        return isinstance(error, requests.ConnectionError) and any(
+            isinstance(arg, ReadTimeoutError) for arg in error.args
+        )
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request bounded by the remaining deadline, reading the body in chunks"""
+        self._check_deadline()
+        remaining = self.remaining()
+        timeout = self.DEFAULT_TIMEOUT if remaining is None else min(remaining, self.DEFAULT_TIMEOUT)
+        
+        response = None
+        tracked = []
+        timer = None
+        expired = threading.Event()
+        
+        def on_connection(conn):
+            # A new checkout means any earlier hop's connection went back to the pool
+            self._untrack(tracked)
+            self._track(tracked, conn)
+        
+        try:
+            # Socket timeouts reset with every byte, so bound the whole
+            # request by wall-clock time
+            if remaining is not None:
+                timer = threading.Timer(remaining, self._expire, (tracked, expired))
+                timer.daemon = True
+                timer.start()
+            
+            with observe_connections(on_connection):
+                response = self.session.request(method, url, timeout=timeout, stream=True, **kwargs)
+            # The connection now belongs to the response until its body is read
+            self._untrack(tracked)
+            self._track(tracked, response)
+            self._check_deadline()
+            
+            chunks = []
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                self._check_deadline()
+                chunks.append(chunk)
+            self._check_deadline()
+            
+            response._content = b''.join(chunks)
+            return response
+        
+        except DeadlineExceeded:
+            if response is not None:
+                response.close()
+            raise
+        except Exception as e:
+            if response is not None:
+                response.close()
+            if expired.is_set() or self._is_deadline_error(e):
+                raise DeadlineExceeded(str(e)) from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._untrack(tracked)
+    
     def _get_common_headers(self) -> Dict[str, str]:
         """Get common headers for requests"""
         return {
@@ -82,7 +245,7 @@ class AcademiaClient:
         }
         
         try:
-            response = self.session.post(url, headers=self._get_common_headers(), data=data)
+            response = self._request('POST', url, headers=self._get_common_headers(), data=data)
             response.raise_for_status()
             
             lookup_data = response.json()
@@ -96,6 +259,9 @@ class AcademiaClient:
                 print("✗ Failed to get user identifier or digest\n")
                 return False
                 
+        except DeadlineExceeded:
+            print("✗ Lookup abandoned: deadline exceeded\n")
+            raise
         except Exception as e:
             print(f"✗ Lookup failed: {str(e)}\n")
             return False
@@ -125,7 +291,7 @@ class AcademiaClient:
         })
         
         try:
-            response = self.session.post(url, headers=self._get_common_headers(), params=params, data=body)
+            response = self._request('POST', url, headers=self._get_common_headers(), params=params, data=body)
             response.raise_for_status()
             
             login_data = response.json()
@@ -137,6 +303,9 @@ class AcademiaClient:
                 print("✗ Login failed!\n")
                 return False
                 
+        except DeadlineExceeded:
+            print("✗ Login abandoned: deadline exceeded\n")
+            raise
         except Exception as e:
             print(f"✗ Login failed: {str(e)}\n")
             return False
@@ -165,7 +334,7 @@ class AcademiaClient:
         }
         
         try:
-            response = self.session.get(url, headers=headers, params=params)
+            response = self.session.get(url, headers=headers, params=params, timeout=self.LOGOUT_TIMEOUT)
             # Logout typically returns 200 or redirects
             if response.status_code in [200, 302, 303]:
                 print("✓ Logout successful!\n")
@@ -200,12 +369,16 @@ class AcademiaClient:
         url = f'{self.BASE_URL}/srm_university/academia-academic-services/page/My_Attendance'
         
         try:
-            response = self.session.get(url, headers=self._get_page_headers())
+            response = self._request('GET', url, headers=self._get_page_headers())
             response.raise_for_status()
+            self._check_deadline()
             
             print(f"✓ Attendance data retrieved (Status: {response.status_code})\n")
             return parse_attendance(response.text)
                 
+        except DeadlineExceeded:
+            print("✗ Attendance fetch abandoned: deadline exceeded\n")
+            raise
         except Exception as e:
             print(f"✗ Failed to fetch attendance: {str(e)}\n")
             return None
@@ -217,12 +390,16 @@ class AcademiaClient:
         url = f'{self.BASE_URL}/srm_university/academia-academic-services/page/My_Time_Table_2023_24'
         
         try:
-            response = self.session.get(url, headers=self._get_page_headers())
+            response = self._request('GET', url, headers=self._get_page_headers())
             response.raise_for_status()
+            self._check_deadline()
             
             print(f"✓ Timetable data retrieved (Status: {response.status_code})\n")
             return parse_timetable(response.text)
                 
+        except DeadlineExceeded:
+            print("✗ Timetable fetch abandoned: deadline exceeded\n")
+            raise
         except Exception as e:
             print(f"✗ Failed to fetch timetable: {str(e)}\n")
             return None
@@ -234,8 +411,9 @@ class AcademiaClient:
         url = f'{self.BASE_URL}/srm_university/academia-academic-services/page/WELCOME'
         
         try:
-            response = self.session.get(url, headers=self._get_page_headers())
+            response = self._request('GET', url, headers=self._get_page_headers())
             response.raise_for_status()
+            self._check_deadline()
             
             # Search for day order pattern in the response
             match = re.search(r'Day\\x20Order\\x3A(\d+)', response.text)
@@ -248,6 +426,9 @@ class AcademiaClient:
                 print("✗ Could not find day order in response\n")
                 return None
                 
+        except DeadlineExceeded:
+            print("✗ Day order fetch abandoned: deadline exceeded\n")
+            raise
         except Exception as e:
             print(f"✗ Failed to fetch day order: {str(e)}\n")
             return None
@@ -0,0 +1,131 @@
+import json
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from studentinfo_scrap import AcademiaClient
+
+
+# Canned portal responses, keyed by a fragment of the request path
+ROUTES = {
+    "lookup": json.dumps({"lookup": {"identifier": "42", "digest": "d1g3st"}}),
+    "password": json.dumps({"passwordauth": {"code": "SIGIN_SUCCESS"}}),
+    "WELCOME": "Day\\x20Order\\x3A2",
+    "My_Attendance": "attendance page",
+    "My_Time_Table": "timetable page",
+    "logout": "bye",
+}
+
+
+class StubPortal:
+    """Local stand-in for the Academia portal with per-route misbehaviour"""
+
+    def __init__(self):
+        self.stalls = {}
+        self.body_stalls = {}
+        self.trickles = {}
+        self.trickle_done = threading.Event()
+        self.trickled_bytes = 0
+        self.abandoned = threading.Event()
+        self.released = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self.server.daemon_threads = True
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def stall(self, route: str, seconds: float):
+        """Wait before sending anything for the route"""
+        self.stalls[route] = seconds
+
+    def stall_body(self, route: str, seconds: float):
+        """Send headers, then wait before sending the body"""
+        self.body_stalls[route] = seconds
+
+    def trickle(self, route: str, interval: float, size: int = 200):
+        """Send the body one byte at a time"""
+        self.trickles[route] = (interval, size)
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.released.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _make_handler(portal: StubPortal):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self._respond()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._respond()
+
+        def _respond(self):
+            route = next(name for name in ROUTES if name in self.path)
+            body = ROUTES[route].encode()
+
+            if route in portal.stalls and self._client_hung_up(portal.stalls[route]):
+                portal.abandoned.set()
+                return
+
+            if route in portal.trickles:
+                interval, size = portal.trickles[route]
+                self._send_headers(size)
+                try:
+                    for _ in range(size):
+                        if portal.released.wait(interval):
+                            return
+                        self.wfile.write(b"x")
+                        self.wfile.flush()
+                        portal.trickled_bytes += 1
+                finally:
+                    portal.trickle_done.set()
+                return
+
+            self._send_headers(len(body))
+            if route in portal.body_stalls:
+                portal.released.wait(portal.body_stalls[route])
+            self.wfile.write(body)
+
+        def _client_hung_up(self, seconds: float) -> bool:
+            """Stall for up to seconds, returning early if the client goes away"""
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if portal.released.wait(0.05):
+                    return False
+                readable, _, _ = select.select([self.connection], [], [], 0)
+                try:
+                    if readable and self.connection.recv(1, socket.MSG_PEEK) == b"":
+                        return True
+                except OSError:
+                    return True
+            return False
+
+        def _send_headers(self, length: int):
+            self.send_response(200)
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            self.wfile.flush()
+
+    return Handler
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    stub = StubPortal()
+    stub.start()
+    monkeypatch.setattr(AcademiaClient, "BASE_URL", stub.url)
+    yield stub
+    stub.stop()
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from studentinfo_scrap import AcademiaClient, DeadlineExceeded
+
+
+CREDENTIALS = {"email": "student@srmist.edu.in", "password": "secret"}
+
+
+def deadline_in(seconds: float) -> float:
+    return time.monotonic() + seconds
+
+
+async def _post_then_disconnect(path: str, payload: dict, disconnect_after: float):
+    """
+    Drive the ASGI app directly, hanging up after disconnect_after seconds
+
+    Returns the response status and how long it took to be sent.
+    """
+    body = json.dumps(payload).encode()
+    disconnect_at = time.monotonic() + disconnect_after
+    started = time.monotonic()
+    body_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Starlette polls with an already-cancelled scope, so only answer
+        # without awaiting once the client has "hung up"
+        if time.monotonic() < disconnect_at:
+            await asyncio.sleep(disconnect_at - time.monotonic())
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append((message, time.monotonic() - started))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return next((m["status"], elapsed) for m, elapsed in messages if m["type"] == "http.response.start")
+
+
+def test_scrape_without_deadline(portal):
+    response = TestClient(app).post("/scrape", json=CREDENTIALS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["missing_sections"] == []
+    assert data["attendance"]["day_order"] == 2
+    assert data["logout_status"] == "success"
+
+
+def test_slow_section_is_reported_missing(portal):
+    portal.stall("My_Time_Table", 10)
+
+    started = time.monotonic()
+    response = TestClient(app).post("/scrape", json=CREDENTIALS, headers={"X-Deadline-Ms": "1000"})
+
+    assert time.monotonic() - started < 3
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "partial"
+    assert data["missing_sections"] == ["timetable"]
+    assert data["timetable"] is None
+    assert data["attendance"]["day_order"] == 2
+    assert data["logout_status"] == "scheduled"
+
+
+def test_deadline_during_lookup_returns_504(portal):
+    portal.stall("lookup", 10)
+
+    started = time.monotonic()
+    response = TestClient(app).post("/scrape?deadline_ms=1000", json=CREDENTIALS)
+
+    assert time.monotonic() - started < 3
+    assert response.status_code == 504
+
+
+def test_stalled_body_raises_deadline_exceeded(portal):
+    portal.stall_body("lookup", 10)
+    client = AcademiaClient(**CREDENTIALS, deadline=deadline_in(1))
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        client.lookup_user()
+    assert time.monotonic() - started < 1.5
+
+
+def test_trickling_body_is_cut_off_at_deadline(portal):
+    # 100 bytes at 50ms each would take 5s; each byte resets the socket timeout
+    portal.trickle("My_Attendance", 0.05, size=100)
+    client = AcademiaClient(**CREDENTIALS, deadline=deadline_in(1))
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        client.get_attendance()
+    assert time.monotonic() - started < 1.5
+
+
+def test_client_disconnect_returns_499(portal):
+    portal.stall("My_Attendance", 3)
+
+    status, elapsed = asyncio.run(_post_then_disconnect("/scrape", CREDENTIALS, disconnect_after=0.5))
+
+    assert status == 499
+    assert elapsed < 3
+
+
+def test_disconnect_releases_stalled_upstream_request(portal):
+    portal.stall("My_Attendance", 10)
+
+    # asyncio.run also waits for the worker thread running the fetch
+    started = time.monotonic()
+    status, _ = asyncio.run(_post_then_disconnect("/scrape", CREDENTIALS, disconnect_after=0.5))
+
+    assert status == 499
+    assert portal.abandoned.wait(2)
+    assert time.monotonic() - started < 3
+
+
+def test_disconnect_aborts_trickling_download(portal):
+    # 200 bytes at 0.1s each would keep the download alive for 20s
+    portal.trickle("My_Attendance", 0.1)
+
+    status, _ = asyncio.run(_post_then_disconnect("/scrape", CREDENTIALS, disconnect_after=0.5))
+
+    assert status == 499
+    assert portal.trickle_done.wait(3)
+    assert portal.trickled_bytes < 50
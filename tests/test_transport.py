@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from urllib3.exceptions import EmptyPoolError
+
+from app import app
+from studentinfo_scrap import AcademiaClient
+from utils.transport import POOL_MAXSIZE, _SharedAdapter, get_shared_adapter
+
+
+def test_pool_stats_after_request(portal):
+    client = AcademiaClient("student@srmist.edu.in", "secret")
+    assert client.lookup_user()
+
+    response = TestClient(app).get("/stats/pool")
+
+    assert response.status_code == 200
+    stats = response.json()
+    host = stats["hosts"][f"http://127.0.0.1:{portal.server.server_port}"]
+    assert host["maxsize"] == POOL_MAXSIZE
+    assert host["requests"] >= 1
+    assert host["in_use"] == 0
+
+
+def test_pool_container_internals_still_exist():
+    # get_pool_stats reads these private urllib3 attributes; fail loudly
+    # here if an urllib3 upgrade removes them
+    pools = get_shared_adapter().poolmanager.pools
+    assert hasattr(pools, "lock")
+    assert isinstance(pools._container, OrderedDict)
+
+
+def test_pool_stats_keep_eviction_order(portal):
+    for url in (portal.url, portal.url.replace("127.0.0.1", "localhost")):
+        session = requests.Session()
+        session.mount("http://", get_shared_adapter())
+        session.get(f"{url}/logout", timeout=5)
+
+    pools = get_shared_adapter().poolmanager.pools
+    before = list(pools._container)
+    TestClient(app).get("/stats/pool")
+    assert list(pools._container) == before
+
+
+def test_blocking_pool_wait_is_bounded_by_timeout(portal):
+    adapter = _SharedAdapter(pool_maxsize=1, pool_block=True)
+    session = requests.Session()
+    session.trust_env = False  # keep the pool key independent of CA bundle env vars
+    session.mount("http://", adapter)
+
+    # Check out the only connection so the next request has to wait for it
+    request = requests.Request("GET", f"{portal.url}/logout").prepare()
+    pool = adapter.get_connection_with_tls_context(request, verify=True)
+    pool._get_conn()
+
+    started = time.monotonic()
+    with pytest.raises(EmptyPoolError):
+        session.get(f"{portal.url}/logout", timeout=0.3)
+    assert time.monotonic() - started < 2
@@ -0,0 +1,161 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Pool sizing, tunable through the environment
+POOL_CONNECTIONS = int(os.environ.get("ACADEMIA_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.environ.get("ACADEMIA_POOL_MAXSIZE", "32"))
+POOL_BLOCK = os.environ.get("ACADEMIA_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_observers = threading.local()
+
+
+@contextmanager
+def observe_connections(callback: Callable[[Any], None]):
+    """
+    Call callback with each pooled connection checked out by this thread
+
+    Lets a caller on another thread shut down the socket of a request that
+    is still waiting for its response headers.
+    """
+    previous = getattr(_observers, "callback", None)
+    _observers.callback = callback
+    try:
+        yield
+    finally:
+        _observers.callback = previous
+
+
+class _BoundedWaitMixin:
+    """
+    Bound the wait for a free pooled connection by the request's connect timeout
+
+    requests never passes pool_timeout, so with pool_block enabled urllib3
+    would otherwise wait forever for a connection to be returned.
+    """
+
+    def urlopen(self, method, url, *args, pool_timeout=None, **kwargs):
+        if pool_timeout is None:
+            timeout = kwargs.get("timeout")
+            connect_timeout = getattr(timeout, "connect_timeout", timeout)
+            if isinstance(connect_timeout, (int, float)):
+                pool_timeout = connect_timeout
+        return super().urlopen(method, url, *args, pool_timeout=pool_timeout, **kwargs)
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        callback = getattr(_observers, "callback", None)
+        if callback is not None:
+            callback(conn)
+        return conn
+
+
+class _BoundedWaitHTTPConnectionPool(_BoundedWaitMixin, HTTPConnectionPool):
+    pass
+
+
+class _BoundedWaitHTTPSConnectionPool(_BoundedWaitMixin, HTTPSConnectionPool):
+    pass
+
+
+class _SharedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools respect the request timeout while waiting for a
+    connection and report checked-out connections to observe_connections
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _BoundedWaitHTTPConnectionPool,
+            "https": _BoundedWaitHTTPSConnectionPool,
+        }
+
+
+def get_shared_adapter() -> HTTPAdapter:
+    """Return the process-wide adapter holding the keep-alive connection pool"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = _SharedAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    pool_block=POOL_BLOCK,
+                )
+    return _adapter
+
+
+def create_session() -> requests.Session:
+    """
+    Create a session with its own cookie jar that reuses the shared pool
+
+    The session must not be closed with Session.close(), as that would
+    tear down the shared adapter for every other client.
+    """
+    session = requests.Session()
+    adapter = get_shared_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Report utilization and connection reuse for the shared pool
+
+    Reads urllib3's private RecentlyUsedContainer internals (lock and
+    _container), which relies on the urllib3 version pinned in
+    requirements.txt; tests/test_transport.py checks they still exist.
+    """
+    adapter = get_shared_adapter()
+    pools = adapter.poolmanager.pools
+
+    # Snapshot without going through __getitem__, which would bump each
+    # pool to the most-recently-used end and skew eviction
+    with pools.lock:
+        snapshot = list(pools._container.values())
+
+    hosts = {}
+    total_requests = 0
+    total_connections = 0
+    for pool in snapshot:
+        queue = pool.pool
+        if queue is None:
+            continue
+
+        # The queue holds idle connections plus empty slots, so whatever is
+        # missing from it is currently checked out by a request
+        maxsize = queue.maxsize
+        in_use = max(maxsize - queue.qsize(), 0)
+        reused = max(pool.num_requests - pool.num_connections, 0)
+        hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+            "maxsize": maxsize,
+            "in_use": in_use,
+            "utilization": round(in_use / maxsize, 4) if maxsize else 0.0,
+            "connections_opened": pool.num_connections,
+            "requests": pool.num_requests,
+            "reuse_rate": round(reused / pool.num_requests, 4) if pool.num_requests else 0.0,
+        }
+        total_requests += pool.num_requests
+        total_connections += pool.num_connections
+
+    total_reused = max(total_requests - total_connections, 0)
+    return {
+        "pool_connections": POOL_CONNECTIONS,
+        "pool_maxsize": POOL_MAXSIZE,
+        "pool_block": POOL_BLOCK,
+        "active_pools": len(hosts),
+        "requests": total_requests,
+        "connections_opened": total_connections,
+        "reuse_rate": round(total_reused / total_requests, 4) if total_requests else 0.0,
+        "hosts": hosts,
+    }